@@ -1,4 +1,6 @@
 import os
+import posixpath
+import re
 
 '''
 Run with: $ python doc-gen.py
@@ -10,6 +12,9 @@ DOCS_PATH = "Docs"
 
 comments = ["<summary>", "Tooltip"]
 
+# Type declarations, only PascalCase names are linked so lowercase scripts like volume.cs don't match plain words
+declaration = re.compile(r"\b(?:class|struct|enum|interface)\s+([A-Z]\w*)")
+
 def get_cs_files() -> list:
     '''
     Recurse through the Assets/Scripts folder to find all cs files.
@@ -22,7 +27,69 @@ def get_cs_files() -> list:
             if filename.endswith(".cs"):
                 cs_filenames.append((filename, root[len(FOLDER_PATH):].replace("\\", "/")))
     
-    return cs_filenames
+    return sorted(cs_filenames, key=lambda filename: (filename[1], filename[0]))
+
+def get_doc_page(filename) -> str:
+    '''
+    Returns the path of the given file's doc page from the Docs folder.
+    Pages mirror the Scripts folder so files with the same name don't overwrite each other.
+    '''
+    return (filename[1] + "/" + filename[0] + ".md").lstrip("/")
+
+def build_symbol_table(filenames):
+    '''
+    Reads every cs file once to find the types it declares.
+    Returns a dict of type name to doc page, and a single regex matching any of the type names.
+    '''
+    symbols = {}
+    for filename in filenames:
+        page = get_doc_page(filename)
+        with open(FOLDER_PATH + filename[1] + "/" + filename[0], "r") as cs_file:
+            for line in cs_file:
+                if line.lstrip().startswith("//"):
+                    continue
+                for name in declaration.findall(line):
+                    symbols.setdefault(name, page)
+
+    if len(symbols) == 0:
+        return symbols, None
+
+    # Longest names first so a name is never cut short by one of its prefixes
+    names = sorted(symbols, key=len, reverse=True)
+    matcher = re.compile(r"\b(" + "|".join(re.escape(name) for name in names) + r")\b")
+    return symbols, matcher
+
+def link_text(text, links, code=False) -> str:
+    '''
+    Replaces every known type name in the text with a link to its doc page.
+    links is the (symbols, matcher, page) of the doc being written, types declared on that page are left alone.
+    If code is set, the text is wrapped in code spans around each link.
+    '''
+    symbols, matcher, page = links
+
+    pieces = [text] if matcher is None else matcher.split(text)
+    linked = ""
+    plain = ""
+    # split() alternates between plain text and matched type names
+    for ind, piece in enumerate(pieces):
+        if ind % 2 == 0 or symbols[piece] == page:
+            plain += piece
+            continue
+        target = posixpath.relpath(symbols[piece], posixpath.dirname(page) or ".")
+        linked += wrap_code(plain) if code else plain
+        linked += f"[`{piece}`]({target})" if code else f"[{piece}]({target})"
+        plain = ""
+    return linked + (wrap_code(plain) if code else plain)
+
+def wrap_code(text) -> str:
+    '''
+    Wraps the text in a code span, keeping surrounding whitespace outside the span so it isn't trimmed.
+    '''
+    stripped = text.strip()
+    if stripped == "":
+        return text
+    start = text.find(stripped)
+    return text[:start] + "`" + stripped + "`" + text[start + len(stripped):]
 
 def find_next_summary(file):
     '''
@@ -161,37 +228,40 @@ def find_next_summary(file):
         return "tip", (tip_str, signature)
 
 
-def write_summary(file, summary):
+def write_summary(file, summary, links):
     '''
     Formats the given summary and writes it to the given file.
+    Known types in the summary are linked using links, see link_text().
     '''
     if summary[0] == "summary":
         sign_type, signature, summary_str, params, returns = summary[1]
+        signature = link_text(signature, links, code=True)
+        summary_str = link_text(summary_str, links)
         if sign_type == "method":
-            file.write(">> **`" + signature + "`**\\\n")
+            file.write(">> **" + signature + "**\\\n")
             file.write(">> " + summary_str + "\n>> \n")
         else:
-            file.write("> ## `" + signature + "`\n")
+            file.write("> ## " + signature + "\n")
             file.write("> **" + summary_str + "**\n> \n")
             return
         
         if len(params) > 0:
             file.write(">> **Arguments:**\\\n")
         for param in params:
-            file.write(f">> *{param[0]}:* {param[1]}")
+            file.write(f">> *{param[0]}:* {link_text(param[1], links)}")
             if param != params[-1]:
                 file.write("\\")
             file.write("\n")
         if returns != "":
-            file.write(">>\n>>**Returns:** " + returns + "\n")
+            file.write(">>\n>>**Returns:** " + link_text(returns, links) + "\n")
         
         if sign_type == "method":
             file.write("> \n")
     
     else:
         tip_str, signature = summary[1]
-        file.write(">> **`" + signature + "`**\\\n")
-        file.write(">> " + tip_str + "\n> \n")
+        file.write(">> **" + link_text(signature, links, code=True) + "**\\\n")
+        file.write(">> " + link_text(tip_str, links) + "\n> \n")
 
 def build_docs(filenames):
     '''
@@ -200,23 +270,38 @@ def build_docs(filenames):
     # Make docs folder
     if not os.path.exists(DOCS_PATH):
         os.makedirs(DOCS_PATH)
+
+    # Remove old pages so deleted or moved scripts don't leave stale docs behind
+    for root, dirs, files in os.walk(DOCS_PATH):
+        for file in files:
+            if file.endswith(".cs.md"):
+                os.remove(os.path.join(root, file))
     
     # Make glossary to link to all file docs
     with open(DOCS_PATH + "/Glossary.md", "w") as glossary:
         glossary.write("# Code Documentation Glossary\n")
 
         for filename in filenames:
-            glossary.write(f"## [{filename[0]}]({filename[0]}.md)\n")
+            page = get_doc_page(filename)
+            glossary.write(f"## [{page[:-len('.md')]}]({page})\n")
+
+    symbols, matcher = build_symbol_table(filenames)
     
     # Make each file's doc
     for filename in filenames:
-        doc = open(DOCS_PATH + "/" + filename[0] + ".md", "w")
+        page = get_doc_page(filename)
+        page_folder = posixpath.dirname(page) or "."
+        links = (symbols, matcher, page)
+
+        os.makedirs(posixpath.join(DOCS_PATH, page_folder), exist_ok=True)
+        doc = open(DOCS_PATH + "/" + page, "w")
         cs_file = open(FOLDER_PATH + filename[1] + "/" + filename[0], "r")
 
         # Create header for doc
-        full_path = "../" + FOLDER_PATH + filename[1] + '/' + filename[0]
+        full_path = posixpath.relpath(FOLDER_PATH + filename[1] + '/' + filename[0], posixpath.join(DOCS_PATH, page_folder))
+        glossary_path = posixpath.relpath("Glossary.md", page_folder)
         doc.write(f"# {filename[0]}\n**Found in [{filename[1]}]({full_path})**\n\n")
-        doc.write(f"[Return to glossary](Glossary.md)\n\n")
+        doc.write(f"[Return to glossary]({glossary_path})\n\n")
 
         # Iterate through each summary and tooltip
         classes = {}
@@ -237,17 +322,17 @@ def build_docs(filenames):
         
         for cls in classes:
             if cls != None:
-                write_summary(doc, cls)
+                write_summary(doc, cls, links)
             
             if cls != None and len(classes[cls]["properties"]) > 0:
                 doc.write("> ### **Serialized Properties:**\n")
             for prop in classes[cls]["properties"]:
-                write_summary(doc, prop)
+                write_summary(doc, prop, links)
 
             if cls != None and len(classes[cls]["methods"]) > 0:
                 doc.write("> ### **Methods, Getters, and Setters:**\n")
             for method in classes[cls]["methods"]:
-                write_summary(doc, method)
+                write_summary(doc, method, links)
             
             doc.write("\n")
         
@@ -0,0 +1,387 @@
+import json
+import os
+import re
+import struct
+import sys
+from itertools import combinations
+
+'''
+Run with: $ python scene-weight.py [--full]
+Reports the assets each build scene in EditorBuildSettings.asset pulls in, following guid references transitively,
+along with their size on disk and a rough estimate of their size in memory.
+Levels (build scenes in Assets/Levels) are then compared pairwise to show which assets stay loaded across a level switch,
+and which the switch has to load.
+
+Per-asset results are cached in .scene-weight-cache.json next to this script, so only changed files are re-read.
+Assets loaded from code (eg. Resources.Load) aren't referenced by guid, so they won't show up.
+'''
+
+PROJECT_PATHS = [
+    "../BALLISTIC",
+    "BALLISTIC",
+    "."
+]
+
+BUILD_SETTINGS = "ProjectSettings/EditorBuildSettings.asset"
+LEVELS_FOLDER = "Assets/Levels/"
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".scene-weight-cache.json")
+CACHE_VERSION = 2
+
+# Number of assets listed per section, unless --full is given
+TOP_ASSETS = 10
+
+YAML_HEADER = b"%YAML"
+GUID_REF = re.compile(rb"guid: ([0-9a-f]{32})")
+SCENE_ENTRY = re.compile(r"^\s*path: (.+\.unity)\s*$")
+
+TEXTURE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".tga", ".psd", ".tif", ".tiff", ".bmp", ".gif", ".exr", ".hdr"}
+# Assumes block compressed textures (DXT5/BC7), one byte per pixel
+TEXTURE_BYTES_PER_PIXEL = 1
+DEFAULT_MAX_TEXTURE_SIZE = 2048
+
+# Rough ratio of in-memory size to on-disk size for everything that isn't a texture, defaults to 1.
+# Scripts and plugins are loaded with the assemblies, not with the scene.
+# YAML assets are stored as binary in builds, which is roughly half the size of the text.
+MEMORY_FACTORS = {
+    ".cs": 0,
+    ".dll": 0,
+    ".so": 0,
+    ".pdb": 0,
+    ".asmdef": 0,
+    ".unity": 0.5,
+    ".prefab": 0.5,
+    ".mat": 0.5,
+    ".asset": 0.5,
+    ".anim": 0.5,
+    ".controller": 0.5,
+}
+
+
+def find_project_path() -> None | str:
+    '''
+    Returns the path to the Unity project folder from the current working directory, or None if it can't be found.
+    '''
+    for path in PROJECT_PATHS:
+        if os.path.exists(os.path.join(path, BUILD_SETTINGS)):
+            return path
+    return None
+
+
+def get_build_scenes(project_path: str) -> list:
+    '''
+    Returns the paths of the enabled scenes in the build settings, in build index order.
+    '''
+    scenes = []
+    enabled = True
+    with open(os.path.join(project_path, BUILD_SETTINGS), "r") as settings:
+        for line in settings:
+            if "enabled:" in line:
+                enabled = line.split(":")[1].strip() == "1"
+            match = SCENE_ENTRY.match(line)
+            if match is not None and enabled:
+                scenes.append(match.group(1))
+    return scenes
+
+
+def load_cache() -> dict:
+    '''
+    Returns the cached asset info, or an empty cache if there isn't one or it's from an older version of this script.
+    '''
+    try:
+        with open(CACHE_PATH, "r") as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("assets", {})
+
+
+def save_cache(assets: dict):
+    '''
+    Writes the asset info to the cache file.
+    '''
+    with open(CACHE_PATH, "w") as cache_file:
+        json.dump({"version": CACHE_VERSION, "assets": assets}, cache_file)
+
+
+def index_assets(project_path: str, cache: dict) -> dict:
+    '''
+    Finds every asset in the Assets folder and returns a dict of guid to asset path.
+    Cache entries for changed assets are reset, and entries for deleted assets are dropped.
+    '''
+    guids = {}
+    seen = set()
+    for root, dirs, files in os.walk(os.path.join(project_path, "Assets")):
+        for filename in files:
+            if filename.endswith(".meta") or filename + ".meta" not in files:
+                continue
+
+            full_path = os.path.join(root, filename)
+            path = os.path.relpath(full_path, project_path).replace("\\", "/")
+            seen.add(path)
+
+            stat = os.stat(full_path)
+            meta_stat = os.stat(full_path + ".meta")
+            stamp = [stat.st_mtime_ns, stat.st_size, meta_stat.st_mtime_ns, meta_stat.st_size]
+
+            entry = cache.get(path)
+            if entry is None or entry["stamp"] != stamp:
+                entry = {"stamp": stamp, "guid": read_meta_guid(full_path + ".meta")}
+                cache[path] = entry
+            if entry["guid"] is not None:
+                guids[entry["guid"]] = path
+
+    for path in list(cache):
+        if path not in seen:
+            del cache[path]
+
+    return guids
+
+
+def read_meta_guid(meta_path: str) -> None | str:
+    '''
+    Returns the guid stored in the given meta file.
+    '''
+    with open(meta_path, "r") as meta:
+        for line in meta:
+            if line.startswith("guid:"):
+                return line[len("guid:"):].strip()
+    return None
+
+
+def get_asset_info(project_path: str, path: str, cache: dict) -> dict:
+    '''
+    Returns the cache entry for the given asset, filling in its references and sizes if they aren't cached yet.
+    '''
+    entry = cache[path]
+    if "refs" in entry:
+        return entry
+
+    full_path = os.path.join(project_path, path)
+    refs = set()
+
+    # Importer settings can reference other assets, eg. remapped materials on a model
+    with open(full_path + ".meta", "rb") as meta:
+        for line in meta:
+            if not line.startswith(b"guid:"):
+                refs.update(match.decode() for match in GUID_REF.findall(line))
+
+    # Stream YAML assets line by line since scenes can be large, binary assets don't reference anything
+    with open(full_path, "rb") as file:
+        if file.read(len(YAML_HEADER)) == YAML_HEADER:
+            file.seek(0)
+            for line in file:
+                refs.update(match.decode() for match in GUID_REF.findall(line))
+
+    refs.discard(entry["guid"])
+    disk = os.path.getsize(full_path)
+    entry["refs"] = sorted(refs)
+    entry["disk"] = disk
+    entry["memory"] = estimate_memory(full_path, disk)
+    return entry
+
+
+def estimate_memory(full_path: str, disk: int) -> int:
+    '''
+    Returns a rough estimate of how many bytes the asset takes up in memory once loaded.
+    Textures are sized from their dimensions and import settings, everything else scales its size on disk.
+    '''
+    extension = os.path.splitext(full_path)[1].lower()
+    if extension not in TEXTURE_EXTENSIONS:
+        return int(disk * MEMORY_FACTORS.get(extension, 1))
+
+    size = read_image_size(full_path)
+    if size is None:
+        return disk
+    width, height = size
+
+    max_size, mip_maps = read_texture_settings(full_path + ".meta")
+
+    scale = min(1, max_size / max(width, height, 1))
+    memory = int(width * scale) * int(height * scale) * TEXTURE_BYTES_PER_PIXEL
+    # A full mip chain adds a third on top of the base level
+    return memory * 4 // 3 if mip_maps else memory
+
+
+def read_texture_settings(meta_path: str) -> tuple:
+    '''
+    Returns the max texture size and whether mip maps are enabled, from the texture's meta file.
+    The size comes from the Standalone platform settings if they're overridden, otherwise the
+    DefaultTexturePlatform settings. The legacy top level maxTextureSize is only used if neither is present.
+    '''
+    legacy_size = None
+    mip_maps = True
+    platforms = {}
+    platform = None
+    in_platforms = False
+    with open(meta_path, "r") as meta:
+        for line in meta:
+            stripped = line.strip()
+            if in_platforms and line.startswith("  - "):
+                # Each list entry is one platform's settings
+                platform = {}
+                stripped = stripped[len("- "):]
+            elif in_platforms and not line.startswith("    "):
+                in_platforms = False
+                platform = None
+
+            key, _, value = stripped.partition(":")
+            value = value.strip()
+            if platform is not None:
+                platform[key] = value
+                if key == "buildTarget":
+                    platforms[value] = platform
+            elif key == "platformSettings":
+                in_platforms = True
+            elif key == "maxTextureSize" and legacy_size is None:
+                legacy_size = int(value)
+            elif key == "enableMipMap":
+                mip_maps = value == "1"
+
+    settings = platforms.get("DefaultTexturePlatform")
+    standalone = platforms.get("Standalone")
+    if standalone is not None and standalone.get("overridden") == "1":
+        settings = standalone
+
+    if settings is not None and "maxTextureSize" in settings:
+        return int(settings["maxTextureSize"]), mip_maps
+    if legacy_size is not None:
+        return legacy_size, mip_maps
+    return DEFAULT_MAX_TEXTURE_SIZE, mip_maps
+
+
+def read_image_size(full_path: str) -> None | tuple:
+    '''
+    Returns the width and height of a png or jpg image by reading its header, or None for other formats.
+    '''
+    with open(full_path, "rb") as image:
+        header = image.read(24)
+        if header.startswith(b"\x89PNG") and len(header) == 24:
+            return struct.unpack(">II", header[16:24])
+
+        if not header.startswith(b"\xff\xd8"):
+            return None
+
+        # Walk the jpg markers until a start of frame is found
+        image.seek(2)
+        while True:
+            marker = image.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            length = image.read(2)
+            if len(length) < 2:
+                return None
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                frame = image.read(5)
+                if len(frame) < 5:
+                    return None
+                height, width = struct.unpack(">HH", frame[1:5])
+                return width, height
+            image.seek(struct.unpack(">H", length)[0] - 2, 1)
+
+
+def get_dependencies(project_path: str, scene: str, guids: dict, cache: dict) -> set:
+    '''
+    Returns the paths of every asset the scene references, directly or through other assets, including the scene itself.
+    '''
+    found = {scene}
+    stack = [scene]
+    while len(stack) > 0:
+        path = stack.pop()
+        for guid in get_asset_info(project_path, path, cache)["refs"]:
+            ref_path = guids.get(guid)
+            if ref_path is not None and ref_path not in found:
+                found.add(ref_path)
+                stack.append(ref_path)
+    return found
+
+
+def format_size(size: int) -> str:
+    '''
+    Returns the byte count as a human readable string.
+    '''
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def total_sizes(assets, cache: dict) -> tuple:
+    '''
+    Returns the total on-disk and estimated in-memory size of the given assets.
+    '''
+    return sum(cache[path]["disk"] for path in assets), sum(cache[path]["memory"] for path in assets)
+
+
+def print_assets(assets, cache: dict, full: bool):
+    '''
+    Prints the given assets, largest in memory first.
+    '''
+    ordered = sorted(assets, key=lambda path: cache[path]["memory"], reverse=True)
+    shown = ordered if full else ordered[:TOP_ASSETS]
+    for path in shown:
+        print(f"      {format_size(cache[path]['memory']):>10}  {format_size(cache[path]['disk']):>10}  {path}")
+    if len(shown) < len(ordered):
+        print(f"      ... and {len(ordered) - len(shown)} more (use --full to list all)")
+
+
+def build_report(full: bool):
+    '''
+    Computes each build scene's dependencies and prints the per-scene and per-level-pair report.
+    '''
+    project_path = find_project_path()
+    if project_path is None:
+        print("Cannot run script from here. Go to the project root BALLISTIC folder, or the Tools folder.")
+        return
+
+    cache = load_cache()
+    guids = index_assets(project_path, cache)
+
+    scenes = [scene for scene in get_build_scenes(project_path) if scene in cache]
+    dependencies = {}
+    for scene in scenes:
+        dependencies[scene] = get_dependencies(project_path, scene, guids, cache)
+
+    save_cache(cache)
+
+    print("Build scenes (memory estimate / on disk):")
+    for index, scene in enumerate(scenes):
+        disk, memory = total_sizes(dependencies[scene], cache)
+        print(f"  [{index}] {scene}: {len(dependencies[scene])} assets, {format_size(memory)} / {format_size(disk)}")
+
+    levels = [scene for scene in scenes if scene.startswith(LEVELS_FOLDER)]
+    if len(levels) == 0:
+        return
+
+    print("\nLevel switches (assets the next level has to load that the current one doesn't share):")
+    for first, second in combinations(levels, 2):
+        shared = dependencies[first] & dependencies[second]
+        disk, memory = total_sizes(shared, cache)
+        print(f"  {first} <-> {second}: {len(shared)} shared assets, {format_size(memory)} / {format_size(disk)}")
+        print_assets(shared, cache, full)
+        for current, next_level in [(first, second), (second, first)]:
+            to_load = dependencies[next_level] - dependencies[current]
+            disk, memory = total_sizes(to_load, cache)
+            print(f"    {current} -> {next_level}: loads {len(to_load)} assets, {format_size(memory)} / {format_size(disk)}")
+            print_assets(to_load, cache, full)
+
+    print("\nAssets unique to one level:")
+    for level in levels:
+        others = set()
+        for other in levels:
+            if other != level:
+                others |= dependencies[other]
+        unique = dependencies[level] - others
+        disk, memory = total_sizes(unique, cache)
+        print(f"  {level}: {len(unique)} assets, {format_size(memory)} / {format_size(disk)}")
+        print_assets(unique, cache, full)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) > 1 or (len(args) == 1 and args[0] != "--full"):
+        print("Usage: $ python scene-weight.py [--full]")
+    else:
+        build_report(len(args) == 1)
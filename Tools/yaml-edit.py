@@ -0,0 +1,549 @@
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+'''
+Run with: $ python yaml-edit.py <edits.json> [--dry-run] [--force]
+Applies declarative edits to every Unity YAML file (scenes, prefabs, materials, animations...) in the Assets folder.
+
+The edits file is a JSON list, each entry being one of:
+    {"op": "rename", "from": "oldField", "to": "newField", "script": "<guid or script name>"}
+        Renames a serialized field. "from" can be a dotted path to a field inside a serialized class,
+        eg. "settings.oldField", and "to" is the field's new name. Fields inside list elements can't be
+        named this way and are left alone. The "script" key is optional, and limits the rename to
+        components using that script.
+    {"op": "replace-guid", "from": "<old guid>", "to": "<new guid>"}
+        Points every reference to one asset at another, eg. when swapping a prefab.
+    {"op": "set", "script": "<guid or script name>", "property": "field", "value": "5"}
+        Sets a serialized field on every component using the given script, including prefab instances
+        that override it. The value is written as is, and "property" can be a dotted path like "from" above.
+        Fields holding nested values or lists are skipped.
+
+Prefab overrides are matched to a script by looking up the component they target in its source prefab,
+following nested prefabs. Overrides that can't be traced back to a script are skipped.
+
+Files are streamed one YAML document at a time, and any bytes not touched by an edit are written back unchanged.
+Edited files are only swapped in once every file has been processed. If anything was skipped nothing is written,
+so the project isn't left half migrated; check the skipped lines with --dry-run, or write anyway with --force.
+'''
+
+ASSETS_PATHS = [
+    "../BALLISTIC/Assets",
+    "BALLISTIC/Assets",
+    "Assets"
+]
+
+YAML_HEADER = b"%YAML"
+DOC_SEPARATOR = b"--- "
+STRIPPED = b"stripped"
+TMP_SUFFIX = ".yaml-edit.tmp"
+
+# Nested prefabs can be several levels deep, give up on an override target after this many hops
+MAX_SOURCE_DEPTH = 16
+# Unity ids objects of a nested prefab as (source id ^ prefab instance id) & FILE_ID_MASK
+FILE_ID_MASK = 0x7FFFFFFFFFFFFFFF
+
+GUID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+SCRIPT_PATTERN = re.compile(rb"^  m_Script: \{fileID: -?\d+, guid: ([0-9a-f]{32}),")
+DOC_ID_PATTERN = re.compile(rb"^--- !u!(\d+) &(-?\d+)")
+SOURCE_PATTERN = re.compile(rb"^  m_CorrespondingSourceObject: \{fileID: (-?\d+), guid: ([0-9a-f]{32}),")
+SOURCE_PREFAB_PATTERN = re.compile(rb"^  m_SourcePrefab: \{fileID: -?\d+, guid: ([0-9a-f]{32}),")
+TARGET_PATTERN = re.compile(rb"^\s*- target: \{fileID: (-?\d+), guid: ([0-9a-f]{32}),")
+VALUE_PATTERN = re.compile(rb"^(\s*value:)[^\r\n]*(\r?\n|$)")
+KEY_PATTERN = re.compile(rb"^( {2,})(\w+):(?: |\r?\n|$)")
+LIST_ITEM_PATTERN = re.compile(rb"^( *)- ")
+
+PREFAB_INSTANCE_CLASS = b"1001"
+
+# Set in each worker process: guid to asset path, each file's objects, and resolved override targets
+guid_paths = {}
+file_scripts = {}
+resolved_targets = {}
+
+
+def find_assets_path() -> None | str:
+    '''
+    Returns the path to the Assets folder from the current working directory, or None if it can't be found.
+    '''
+    if os.getcwd().endswith("Assets"):
+        return "."
+    for path in ASSETS_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def find_script_guid(assets_path: str, script: str) -> None | str:
+    '''
+    Returns the guid of the given script. The script can either be given as a guid,
+    or as the script's name, in which case its .cs.meta file is looked up.
+    '''
+    if GUID_PATTERN.match(script):
+        return script
+
+    meta_name = (script if script.endswith(".cs") else script + ".cs") + ".meta"
+    for root, dirs, files in os.walk(assets_path):
+        if meta_name in files:
+            with open(os.path.join(root, meta_name), "r") as meta:
+                for line in meta:
+                    if line.startswith("guid:"):
+                        return line[len("guid:"):].strip()
+    return None
+
+
+def load_edits(edits_path: str, assets_path: str) -> list:
+    '''
+    Reads the edits file, and compiles each edit into a tuple of (op, description, script guid, patterns...)
+    that can be applied to raw file bytes.
+    Raises a ValueError if an edit is malformed.
+    '''
+    with open(edits_path, "r") as edits_file:
+        raw_edits = json.load(edits_file)
+
+    edits = []
+    for raw in raw_edits:
+        op = raw.get("op")
+
+        script_guid = None
+        if "script" in raw:
+            script_guid = find_script_guid(assets_path, raw["script"])
+            if script_guid is None:
+                raise ValueError(f"Could not find a guid for script '{raw['script']}'")
+
+        if op == "rename":
+            if "." in raw["to"]:
+                raise ValueError(f"'to' is the field's new name, not a path: {raw}")
+            old_path = raw["from"].encode()
+            new_path = old_path.rpartition(b".")[0] + (b"." if b"." in old_path else b"") + raw["to"].encode()
+            override = re.compile(rb"^(\s*propertyPath: )" + re.escape(old_path) + rb"(\.|\r?\n|$)")
+            desc = f"rename {raw['from']} -> {raw['to']}" + (f" on {raw['script']}" if script_guid else "")
+            edits.append(("rename", desc, script_guid, tuple(old_path.split(b".")), raw["to"].encode(), override, new_path))
+
+        elif op == "replace-guid":
+            old, new = raw["from"], raw["to"]
+            if not GUID_PATTERN.match(old) or not GUID_PATTERN.match(new):
+                raise ValueError(f"'{old}' and '{new}' must both be 32 character guids")
+            desc = f"replace guid {old} -> {new}"
+            edits.append(("replace-guid", desc, None, b"guid: " + old.encode(), b"guid: " + new.encode()))
+
+        elif op == "set":
+            if script_guid is None:
+                raise ValueError(f"A 'set' edit needs a script: {raw}")
+            prop = raw["property"].encode()
+            override = re.compile(rb"^\s*propertyPath: " + re.escape(prop) + rb"(\.|\r?\n|$)")
+            value = str(raw["value"]).encode()
+            desc = f"set {raw['property']} = {raw['value']} on {raw['script']}"
+            edits.append(("set", desc, script_guid, tuple(prop.split(b".")), value, override))
+
+        else:
+            raise ValueError(f"Unknown edit op '{op}'")
+
+    return edits
+
+
+def read_documents(file):
+    '''
+    Yields each YAML document in the given binary file as a list of lines, including line endings.
+    The file header (%YAML and %TAG lines) is yielded as its own document.
+    '''
+    doc = []
+    for line in file:
+        if line.startswith(DOC_SEPARATOR) and len(doc) > 0:
+            yield doc
+            doc = []
+        doc.append(line)
+    if len(doc) > 0:
+        yield doc
+
+
+def index_guids(assets_path: str) -> dict:
+    '''
+    Returns a dict of guid to asset path for every asset in the Assets folder, read from their meta files.
+    '''
+    guids = {}
+    for root, dirs, files in os.walk(assets_path):
+        for filename in files:
+            if not filename.endswith(".meta"):
+                continue
+            with open(os.path.join(root, filename), "r") as meta:
+                for line in meta:
+                    if line.startswith("guid:"):
+                        guids[line[len("guid:"):].strip()] = os.path.join(root, filename[:-len(".meta")])
+                        break
+    return guids
+
+
+def init_worker(guids: dict):
+    '''
+    Stores the guid index in the worker process, so override targets can be traced to their source prefabs.
+    '''
+    global guid_paths
+    guid_paths = guids
+
+
+def read_file_scripts(path: str) -> tuple:
+    '''
+    Returns a dict of each object's file id in the given asset to its script guid, or to the
+    (file id, guid) of its source object if it's a stripped object from a nested prefab.
+    Objects without a script map to an empty string.
+    Also returns a list of (file id, source prefab guid) for each nested prefab instance in the asset.
+    Binary assets return None instead of a dict.
+    '''
+    if path in file_scripts:
+        return file_scripts[path]
+
+    objects = None
+    instances = []
+    with open(path, "rb") as file:
+        if file.read(len(YAML_HEADER)) == YAML_HEADER:
+            objects = {}
+            file.seek(0)
+            for doc in read_documents(file):
+                match = DOC_ID_PATTERN.match(doc[0])
+                if match is None:
+                    continue
+                file_id = match.group(2).decode()
+
+                if match.group(1) == PREFAB_INSTANCE_CLASS:
+                    for line in doc[1:]:
+                        found = SOURCE_PREFAB_PATTERN.match(line)
+                        if found is not None:
+                            instances.append((file_id, found.group(1).decode()))
+                            break
+                    continue
+
+                objects[file_id] = ""
+                pattern = SOURCE_PATTERN if STRIPPED in doc[0] else SCRIPT_PATTERN
+                for line in doc[1:]:
+                    found = pattern.match(line)
+                    if found is None:
+                        continue
+                    if pattern is SOURCE_PATTERN:
+                        objects[file_id] = (found.group(1).decode(), found.group(2).decode())
+                    else:
+                        objects[file_id] = found.group(1).decode()
+                    break
+
+    file_scripts[path] = (objects, instances)
+    return objects, instances
+
+
+def nested_source_ids(file_id: str, instance_id: str) -> list:
+    '''
+    Returns the possible ids an object had in its source prefab, given its id in a prefab nesting it.
+    The top bit is masked off by Unity, so the source id could have been either sign.
+    '''
+    source_id = (int(file_id) ^ int(instance_id)) & FILE_ID_MASK
+    return [str(source_id), str(source_id - (FILE_ID_MASK + 1))]
+
+
+def resolve_target_script(file_id: str, guid: str, depth: int = 0) -> None | str:
+    '''
+    Returns the script guid of the object a prefab override targets, following nested prefabs back to the source.
+    Returns an empty string if the target has no script, or None if the target can't be found.
+    '''
+    key = (file_id, guid)
+    if key in resolved_targets:
+        return resolved_targets[key]
+
+    path = guid_paths.get(guid)
+    if depth >= MAX_SOURCE_DEPTH or path is None or not os.path.isfile(path):
+        return None
+
+    objects, instances = read_file_scripts(path)
+    if objects is None:
+        # Models and other binary assets can't hold script components
+        result = ""
+    elif isinstance(objects.get(file_id), tuple):
+        result = resolve_target_script(*objects[file_id], depth + 1)
+    elif file_id in objects:
+        result = objects[file_id]
+    else:
+        # Objects of nested prefabs aren't written out, try each nested instance their id could come from
+        result = None
+        from_model = False
+        for instance_id, source_guid in instances:
+            source_path = guid_paths.get(source_guid)
+            if source_path is not None and os.path.isfile(source_path) and read_file_scripts(source_path)[0] is None:
+                # Any id resolves in a model, so only fall back on one if no prefab has the object
+                from_model = True
+                continue
+            for source_id in nested_source_ids(file_id, instance_id):
+                result = resolve_target_script(source_id, source_guid, depth + 1)
+                if result is not None:
+                    break
+            if result is not None:
+                break
+        if result is None and from_model:
+            result = ""
+
+    resolved_targets[key] = result
+    return result
+
+
+def field_paths(doc: list) -> list:
+    '''
+    Returns the dotted path of the field each line of the document sets, as a tuple of keys, or None for
+    lines that aren't fields. Fields inside list elements also return None, they can't be named by a path.
+    The document's type line (eg. MonoBehaviour:) isn't part of the path.
+    '''
+    paths = []
+    stack = []
+    for line in doc:
+        key = KEY_PATTERN.match(line)
+        item = None if key is not None else LIST_ITEM_PATTERN.match(line)
+        if key is None and item is None:
+            paths.append(None)
+            continue
+
+        indent = len((key or item).group(1))
+        while len(stack) > 0 and stack[-1][0] >= indent:
+            stack.pop()
+        stack.append((indent, None if item is not None else key.group(2)))
+
+        if any(name is None for _, name in stack):
+            paths.append(None)
+        else:
+            paths.append(tuple(name for _, name in stack))
+    return paths
+
+
+def is_nested(doc: list, ind: int) -> bool:
+    '''
+    Returns true if the field on the given line holds a nested value, ie. the following lines are its children.
+    Unity writes lists at the same indent as their key, so list items count as children too.
+    '''
+    if ind + 1 >= len(doc):
+        return False
+    indent = len(doc[ind]) - len(doc[ind].lstrip(b" "))
+    next_line = doc[ind + 1]
+    next_indent = len(next_line) - len(next_line.lstrip(b" "))
+    return next_indent > indent or (next_indent == indent and next_line[indent:].startswith(b"- "))
+
+
+def describe(line: bytes) -> str:
+    '''
+    Returns the line as a string for the summary.
+    '''
+    return line.decode(errors="replace").strip()
+
+
+def edit_document(doc: list, edits: list, counts: list, skipped: list) -> bool:
+    '''
+    Applies each edit to the given document's lines in place, adding the number of changed lines to counts.
+    Lines an edit can't safely change are added to skipped as (edit index, document header, reason).
+    Returns true if any line was changed.
+    '''
+    script_guid = None
+    for line in doc:
+        match = SCRIPT_PATTERN.match(line)
+        if match is not None:
+            script_guid = match.group(1).decode()
+            break
+
+    header = describe(doc[0])
+    changed = False
+    for i, edit in enumerate(edits):
+        op = edit[0]
+        scoped = edit[2] is None or edit[2] == script_guid
+        paths = field_paths(doc) if op != "replace-guid" and scoped else None
+        target = None
+        set_value = False
+
+        for ind, line in enumerate(doc):
+            new_line = line
+
+            target_match = TARGET_PATTERN.match(line)
+            if target_match is not None:
+                target = (target_match.group(1).decode(), target_match.group(2).decode())
+                set_value = False
+
+            # Overrides target a component in another file, only edit them if it uses the script
+            override = None
+            if op != "replace-guid" and edit[5].match(line) is not None:
+                target_script = edit[2]
+                if edit[2] is not None:
+                    target_script = None if target is None else resolve_target_script(*target)
+                    if target_script is None:
+                        skipped.append((i, header, "override target not found: " + describe(line)))
+                override = edit[5].match(line) if target_script == edit[2] else None
+
+            if op == "rename":
+                old, new, new_path = edit[3], edit[4], edit[6]
+                if paths is not None and paths[ind] == old:
+                    key = KEY_PATTERN.match(line)
+                    new_line = key.group(1) + new + line[key.end(2):]
+                elif override is not None:
+                    new_line = override.group(1) + new_path + override.group(2) + line[override.end():]
+
+            elif op == "replace-guid":
+                new_line = line.replace(edit[3], edit[4])
+
+            elif op == "set":
+                prop, value = edit[3], edit[4]
+                if paths is not None and paths[ind] == prop:
+                    if is_nested(doc, ind):
+                        # Replacing the key would leave its children orphaned underneath
+                        skipped.append((i, header, "nested value: " + describe(line)))
+                    else:
+                        key = KEY_PATTERN.match(line)
+                        line_end = line[len(line.rstrip(b"\r\n")):]
+                        new_line = line[:key.end(2) + 1] + b" " + value + line_end
+                elif override is not None:
+                    if override.group(1) == b".":
+                        skipped.append((i, header, "nested override: " + describe(line)))
+                    else:
+                        set_value = True
+                elif set_value:
+                    value_match = VALUE_PATTERN.match(line)
+                    if value_match is not None:
+                        new_line = value_match.group(1) + b" " + value + value_match.group(2)
+                        set_value = False
+
+            if new_line != line:
+                doc[ind] = new_line
+                counts[i] += 1
+                changed = True
+
+    return changed
+
+
+def edit_file(path: str, edits: list, dry_run: bool) -> tuple:
+    '''
+    Streams the given file one document at a time, applying the edits to each.
+    Unless dry_run is set, the edited file is written next to the original, for run_edits() to swap in.
+    Returns the path, the number of lines changed by each edit, the lines that were skipped, and the
+    path of the edited file, or None if nothing was written.
+    '''
+    counts = [0] * len(edits)
+    skipped = []
+    tmp_path = None if dry_run else path + TMP_SUFFIX
+
+    try:
+        with open(path, "rb") as file:
+            if not file.read(len(YAML_HEADER)) == YAML_HEADER:
+                # Binary serialized asset, leave it alone
+                return path, counts, skipped, None
+            file.seek(0)
+
+            out = None if dry_run else open(tmp_path, "wb")
+            try:
+                for doc in read_documents(file):
+                    edit_document(doc, edits, counts, skipped)
+                    if out is not None:
+                        out.writelines(doc)
+            finally:
+                if out is not None:
+                    out.close()
+
+    except OSError as e:
+        remove_tmp(tmp_path)
+        return path, [0] * len(edits), skipped + [(-1, "", "could not edit file: " + str(e))], None
+    except BaseException:
+        remove_tmp(tmp_path)
+        raise
+
+    if tmp_path is not None and sum(counts) == 0:
+        remove_tmp(tmp_path)
+        tmp_path = None
+    return path, counts, skipped, tmp_path
+
+
+def remove_tmp(tmp_path: None | str):
+    '''
+    Deletes the given edited file if it exists, so Unity doesn't import it as an asset.
+    '''
+    if tmp_path is not None and os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def get_yaml_files(assets_path: str) -> list:
+    '''
+    Recurse through the Assets folder to find every file that could be a Unity YAML file.
+    Binary files are filtered out by edit_file() from their header.
+    '''
+    yaml_files = []
+    for root, dirs, files in os.walk(assets_path):
+        for filename in files:
+            if not filename.endswith(".meta") and not filename.endswith(TMP_SUFFIX):
+                yaml_files.append(os.path.join(root, filename))
+    return yaml_files
+
+
+def run_edits(edits_path: str, dry_run: bool, force: bool):
+    '''
+    Applies the edits in the given file to every YAML file in the Assets folder in parallel, then prints a summary.
+    Edited files are only swapped in once all files are done, and only if nothing was skipped or force is set.
+    '''
+    assets_path = find_assets_path()
+    if assets_path is None:
+        print("Cannot run script from here. Go to the project root BALLISTIC folder, the Tools folder, or the Assets folder.")
+        return
+
+    try:
+        edits = load_edits(edits_path, assets_path)
+    except (OSError, ValueError, KeyError) as e:
+        print("Invalid edits file: " + str(e))
+        return
+
+    yaml_files = get_yaml_files(assets_path)
+    print(f"{'Checking' if dry_run else 'Editing'} {len(yaml_files)} files...")
+
+    totals = [0] * len(edits)
+    touched = [0] * len(edits)
+    changed_files = []
+    skipped_lines = []
+    tmp_paths = []
+    guids = index_guids(assets_path) if any(edit[2] is not None for edit in edits) else {}
+    try:
+        with ProcessPoolExecutor(initializer=init_worker, initargs=(guids,)) as executor:
+            results = executor.map(edit_file, yaml_files, [edits] * len(yaml_files), [dry_run] * len(yaml_files), chunksize=8)
+            for path, counts, skipped, tmp_path in results:
+                for i, header, reason in skipped:
+                    skipped_lines.append((path, i, header, reason))
+                if tmp_path is not None:
+                    tmp_paths.append((path, tmp_path))
+                if sum(counts) == 0:
+                    continue
+                changed_files.append((path, counts))
+                for i, count in enumerate(counts):
+                    totals[i] += count
+                    touched[i] += 1 if count > 0 else 0
+
+        if len(skipped_lines) == 0 or force:
+            while len(tmp_paths) > 0:
+                path, tmp_path = tmp_paths.pop()
+                try:
+                    os.replace(tmp_path, path)
+                except OSError as e:
+                    skipped_lines.append((path, -1, "", "could not write file: " + str(e)))
+    finally:
+        # Failed part way, clean up every edited file including ones from workers that didn't report back
+        for path in yaml_files:
+            remove_tmp(path + TMP_SUFFIX)
+
+    written = not dry_run and (len(skipped_lines) == 0 or force)
+    for path, counts in sorted(changed_files):
+        print(f"  {os.path.relpath(path, assets_path)}: {sum(counts)} line(s)")
+
+    print("\nSummary" + (":" if written else " (nothing written):"))
+    for i, edit in enumerate(edits):
+        print(f"  {edit[1]}: {totals[i]} line(s) in {touched[i]} file(s)")
+
+    if len(skipped_lines) > 0:
+        print(f"\nSkipped {len(skipped_lines)} line(s), these need to be edited by hand:")
+        for path, i, header, reason in sorted(skipped_lines):
+            print(f"  {os.path.relpath(path, assets_path)} ({header}) {edits[i][1] if i >= 0 else 'error'}: {reason}")
+        if not dry_run and not force:
+            print("\nNothing was written so the project isn't left half migrated. Fix these first, or rerun with --force to write anyway.")
+
+
+if __name__ == "__main__":
+    flags = ["--dry-run", "--force"]
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    if len(args) != 1:
+        print("Usage: $ python yaml-edit.py <edits.json> [--dry-run] [--force]")
+    else:
+        run_edits(args[0], "--dry-run" in sys.argv, "--force" in sys.argv)